@@ -1,12 +1,16 @@
+import os
 import sys
 import enum
+import random
 from typing import List, Tuple, Optional
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QGridLayout,
                              QLabel, QPushButton, QVBoxLayout, QHBoxLayout)
 from PyQt5.QtGui import QPixmap, QColor, QPainter, QFont, QBrush
-from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtCore import Qt, QSize, QRect, QRectF
+from PyQt5.QtSvg import QSvgRenderer
 
-class PieceType(enum.Enum):
+# Integer enums so comparisons and table indexing stay on plain ints
+class PieceType(enum.IntEnum):
     PAWN = 1
     ROOK = 2
     KNIGHT = 3
@@ -14,146 +18,225 @@ class PieceType(enum.Enum):
     QUEEN = 5
     KING = 6
 
-class Color(enum.Enum):
-    WHITE = 1
-    BLACK = 2
+class Color(enum.IntEnum):
+    WHITE = 0
+    BLACK = 1
+
+# Bitboards use one bit per square, numbered sq = x * 8 + y, so bit 0 is
+# the top-left square as drawn on screen (a8) and bit 63 is h1.
+KNIGHT_OFFSETS = [(2, 1), (2, -1), (-2, 1), (-2, -1),
+                  (1, 2), (1, -2), (-1, 2), (-1, -2)]
+KING_OFFSETS = [(0, 1), (0, -1), (1, 0), (-1, 0),
+                (1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+# Sliding directions. The first four increase the square index and the last
+# four decrease it, which decides whether the nearest blocker on a ray is
+# its lowest or its highest set bit.
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1),
+              (0, -1), (-1, 0), (-1, -1), (-1, 1)]
+ROOK_DIRECTIONS = [0, 1, 4, 5]
+BISHOP_DIRECTIONS = [2, 3, 6, 7]
+
+def _offset_mask(x, y, offsets):
+    mask = 0
+    for dx, dy in offsets:
+        nx, ny = x + dx, y + dy
+        if 0 <= nx < 8 and 0 <= ny < 8:
+            mask |= 1 << (nx * 8 + ny)
+    return mask
+
+def _ray_mask(x, y, dx, dy):
+    mask = 0
+    x += dx
+    y += dy
+    while 0 <= x < 8 and 0 <= y < 8:
+        mask |= 1 << (x * 8 + y)
+        x += dx
+        y += dy
+    return mask
+
+KNIGHT_ATTACKS = [_offset_mask(sq >> 3, sq & 7, KNIGHT_OFFSETS) for sq in range(64)]
+KING_ATTACKS = [_offset_mask(sq >> 3, sq & 7, KING_OFFSETS) for sq in range(64)]
+
+# Board masks for pawn shifts. White pawns move towards lower square
+# indices (right shifts), black pawns towards higher ones (left shifts).
+ALL_SQUARES = (1 << 64) - 1
+FILE_A = 0x0101010101010101
+FILE_H = 0x8080808080808080
+RANK_3 = 0xFF << 40  # Row 5, reached by a white pawn's first single push
+RANK_6 = 0xFF << 16  # Row 2, reached by a black pawn's first single push
+
+RAY = [[_ray_mask(sq >> 3, sq & 7, dx, dy) for sq in range(64)]
+       for dx, dy in DIRECTIONS]
+
+# Non-empty rays leaving each square, per piece type.
+# Each entry is (ray, the same direction's rays from every square, whether
+# the ray runs towards higher square indices).
+ROOK_RAYS = [[(RAY[d][sq], RAY[d], d < 4) for d in ROOK_DIRECTIONS if RAY[d][sq]]
+             for sq in range(64)]
+BISHOP_RAYS = [[(RAY[d][sq], RAY[d], d < 4) for d in BISHOP_DIRECTIONS if RAY[d][sq]]
+               for sq in range(64)]
+QUEEN_RAYS = [ROOK_RAYS[sq] + BISHOP_RAYS[sq] for sq in range(64)]
+
+def lsb_index(bits):
+    """Index of the lowest set bit"""
+    return (bits & -bits).bit_length() - 1
+
+def msb_index(bits):
+    """Index of the highest set bit"""
+    return bits.bit_length() - 1
+
+def pop_lsb(bits):
+    """The bitboard with its lowest set bit cleared"""
+    return bits & (bits - 1)
+
+if hasattr(int, 'bit_count'):
+    popcount = int.bit_count  # Python 3.10+
+else:
+    def popcount(bits):
+        """Number of set bits"""
+        return bin(bits).count('1')
+
+# The code below inlines lsb_index, msb_index and pop_lsb, since a Python
+# function call per bit costs more than the bit operations themselves.
+def iter_bits(bits):
+    """Yield the index of every set bit, lowest first"""
+    while bits:
+        yield (bits & -bits).bit_length() - 1  # lsb_index
+        bits &= bits - 1  # pop_lsb
+
+def _build_slider(rays):
+    """Compile a sliding-move function specialised to one list of rays
+
+    The generated function is equivalent to looping over the rays and
+    stopping each at its first blocker, but the loop is unrolled and the
+    ray masks are inlined as constants.
+    """
+    namespace = {}
+    lines = ['def slide(occupied):', '    targets = 0']
+    for i, (ray, beyond, forward) in enumerate(rays):
+        namespace['beyond%d' % i] = beyond
+        if forward:
+            first = '(blockers & -blockers).bit_length() - 1'  # lsb_index
+        else:
+            first = 'blockers.bit_length() - 1'  # msb_index
+        lines += ['    blockers = occupied & %#x' % ray,
+                  '    if blockers:',
+                  '        targets |= %#x ^ beyond%d[%s]' % (ray, i, first),
+                  '    else:',
+                  '        targets |= %#x' % ray]
+    lines.append('    return targets')
+    exec('\n'.join(lines), namespace)
+    return namespace['slide']
+
+# Per-square sliding functions: XXX_SLIDE[sq](occupied) is the bitboard of
+# squares along the piece's rays up to and including the first blockers
+ROOK_SLIDE = [_build_slider(ROOK_RAYS[sq]) for sq in range(64)]
+BISHOP_SLIDE = [_build_slider(BISHOP_RAYS[sq]) for sq in range(64)]
+QUEEN_SLIDE = [_build_slider(QUEEN_RAYS[sq]) for sq in range(64)]
+
+# Move generation kernels. They take plain ints (square index and
+# occupancy bitboards) and return the bitboard of destination squares.
+def pawn_attacks(color, pawns):
+    """Squares attacked diagonally by a set of pawns"""
+    if color == Color.WHITE:
+        return (pawns >> 9) & ~FILE_H | (pawns >> 7) & ~FILE_A
+    return ((pawns << 7) & ~FILE_H | (pawns << 9) & ~FILE_A) & ALL_SQUARES
+
+def pawn_moves(color, pawns, occupied, enemy):
+    empty = ~occupied & ALL_SQUARES
+
+    # Forward move, and the initial two-square move for pawns whose first
+    # step landed on the rank in front of their starting rank
+    if color == Color.WHITE:
+        single = (pawns >> 8) & empty
+        double = ((single & RANK_3) >> 8) & empty
+    else:
+        single = (pawns << 8) & empty
+        double = ((single & RANK_6) << 8) & empty
+
+    # Diagonal captures
+    return single | double | pawn_attacks(color, pawns) & enemy
+
+def rook_moves(sq, occupied, own):
+    return ROOK_SLIDE[sq](occupied) & ~own
+
+def knight_moves(sq, own):
+    return KNIGHT_ATTACKS[sq] & ~own
+
+def bishop_moves(sq, occupied, own):
+    return BISHOP_SLIDE[sq](occupied) & ~own
+
+def queen_moves(sq, occupied, own):
+    # Rook and bishop rays scanned in a single pass
+    return QUEEN_SLIDE[sq](occupied) & ~own
+
+def king_moves(sq, own):
+    return KING_ATTACKS[sq] & ~own
+
+def bitboard_index(piece_type, color):
+    """Index into ChessBoard.bb for the given piece type and color"""
+    return color * 6 + piece_type - 1
+
+# Unicode symbols indexed by ChessPiece.code
+SYMBOLS = ['♙', '♖', '♘', '♗', '♕', '♔',  # White
+           '♟', '♜', '♞', '♝', '♛', '♚']  # Black
+
+# Optional SVG sprites, pieces/<name>.svg next to this file, with names
+# indexed by ChessPiece.code. Pieces without a sprite use their symbol.
+PIECE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pieces')
+SPRITE_NAMES = ['wP', 'wR', 'wN', 'wB', 'wQ', 'wK',
+                'bP', 'bR', 'bN', 'bB', 'bQ', 'bK']
+
+# Zobrist keys, indexed like ChessBoard.bb and then by square
+ZOBRIST = [[random.getrandbits(64) for _ in range(64)] for _ in range(12)]
+
+# Upper bound on ChessBoard's move cache before it is cleared
+MOVE_CACHE_SIZE = 1 << 16
 
 class ChessPiece:
-    def __init__(self, piece_type: PieceType, color: Color, initial_pos: Tuple[int, int]):
+    __slots__ = ('type', 'color', 'position', 'has_moved', 'code',
+                 'cached_version', 'cached_moves')
+
+    def __init__(self, piece_type: PieceType, color: Color, initial_sq: int):
         self.type = piece_type
         self.color = color
-        self.position = initial_pos
+        self.position = initial_sq  # Square index, (x << 3) | y
         self.has_moved = False
+        # Type and color packed into one int, the piece's ChessBoard.bb index
+        self.code = bitboard_index(piece_type, color)
+        # Last move list from ChessBoard.get_possible_moves and the board
+        # version it was generated for
+        self.cached_version = -1
+        self.cached_moves = None
 
     def get_possible_moves(self, board):
-        """Generate possible moves for the piece"""
-        if self.type == PieceType.PAWN:
-            return self._get_pawn_moves(board)
-        elif self.type == PieceType.ROOK:
-            return self._get_rook_moves(board)
-        elif self.type == PieceType.KNIGHT:
-            return self._get_knight_moves(board)
-        elif self.type == PieceType.BISHOP:
-            return self._get_bishop_moves(board)
-        elif self.type == PieceType.QUEEN:
-            return self._get_queen_moves(board)
-        elif self.type == PieceType.KING:
-            return self._get_king_moves(board)
-        return []
-
-    def _get_pawn_moves(self, board):
-        moves = []
-        x, y = self.position
-        direction = -1 if self.color == Color.WHITE else 1
-
-        # Forward move
-        if 0 <= x + direction < 8 and board[x + direction][y] is None:
-            moves.append((x + direction, y))
-
-            # Initial two-square move
-            if not self.has_moved and 0 <= x + 2*direction < 8 and board[x + 2*direction][y] is None:
-                moves.append((x + 2*direction, y))
-
-        # Diagonal captures
-        capture_positions = [
-            (x + direction, y - 1),
-            (x + direction, y + 1)
-        ]
-
-        for nx, ny in capture_positions:
-            if 0 <= nx < 8 and 0 <= ny < 8:
-                target_piece = board[nx][ny]
-                if target_piece and target_piece.color != self.color:
-                    moves.append((nx, ny))
-
-        return moves
-
-    def _get_rook_moves(self, board):
-        moves = []
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-
-        for dx, dy in directions:
-            x, y = self.position
-            while True:
-                x += dx
-                y += dy
-
-                if not (0 <= x < 8 and 0 <= y < 8):
-                    break
-
-                if board[x][y] is None:
-                    moves.append((x, y))
-                else:
-                    if board[x][y].color != self.color:
-                        moves.append((x, y))
-                    break
-
-        return moves
-
-    def _get_knight_moves(self, board):
-        moves = []
-        knight_moves = [
-            (2, 1), (2, -1), (-2, 1), (-2, -1),
-            (1, 2), (1, -2), (-1, 2), (-1, -2)
-        ]
-
-        x, y = self.position
-
-        for dx, dy in knight_moves:
-            nx, ny = x + dx, y + dy
-
-            if 0 <= nx < 8 and 0 <= ny < 8:
-                target_piece = board[nx][ny]
-                if target_piece is None or target_piece.color != self.color:
-                    moves.append((nx, ny))
-
-        return moves
-
-    def _get_bishop_moves(self, board):
-        moves = []
-        directions = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-
-        for dx, dy in directions:
-            x, y = self.position
-            while True:
-                x += dx
-                y += dy
-
-                if not (0 <= x < 8 and 0 <= y < 8):
-                    break
-
-                if board[x][y] is None:
-                    moves.append((x, y))
-                else:
-                    if board[x][y].color != self.color:
-                        moves.append((x, y))
-                    break
-
-        return moves
-
-    def _get_queen_moves(self, board):
-        # Queen moves are combination of rook and bishop moves
-        return (self._get_rook_moves(board) +
-                self._get_bishop_moves(board))
-
-    def _get_king_moves(self, board):
-        moves = []
-        king_moves = [
-            (0, 1), (0, -1), (1, 0), (-1, 0),
-            (1, 1), (1, -1), (-1, 1), (-1, -1)
-        ]
-
-        x, y = self.position
-
-        for dx, dy in king_moves:
-            nx, ny = x + dx, y + dy
-
-            if 0 <= nx < 8 and 0 <= ny < 8:
-                target_piece = board[nx][ny]
-                if target_piece is None or target_piece.color != self.color:
-                    moves.append((nx, ny))
-
-        return moves
+        """Generate the destination squares of the piece on the given ChessBoard"""
+        sq = self.position
+        piece_type = self.type
+        occupied = board.occ
+        own, enemy = self._occupancy(board)
+        if piece_type == PieceType.PAWN:
+            targets = pawn_moves(self.color, 1 << sq, occupied, enemy)
+        elif piece_type == PieceType.ROOK:
+            targets = rook_moves(sq, occupied, own)
+        elif piece_type == PieceType.KNIGHT:
+            targets = knight_moves(sq, own)
+        elif piece_type == PieceType.BISHOP:
+            targets = bishop_moves(sq, occupied, own)
+        elif piece_type == PieceType.QUEEN:
+            targets = queen_moves(sq, occupied, own)
+        elif piece_type == PieceType.KING:
+            targets = king_moves(sq, own)
+        else:
+            return []
+        return list(iter_bits(targets))
+
+    def _occupancy(self, board):
+        """Return the (own, enemy) occupancy bitboards"""
+        if self.color == Color.WHITE:
+            return board.occ_w, board.occ_b
+        return board.occ_b, board.occ_w
 
 class ChessBoard(QWidget):
     def __init__(self):
@@ -163,9 +246,31 @@ class ChessBoard(QWidget):
         self.CELL_SIZE = self.BOARD_SIZE // 8
         self.setFixedSize(self.BOARD_SIZE, self.BOARD_SIZE)
         
-        self.board = [[None for _ in range(8)] for _ in range(8)]
+        # Piece objects by square index (x << 3) | y, for drawing and
+        # selection; the bitboards below mirror them for move generation
+        self.squares = [None] * 64
+        self.bb = [0] * 12  # One bitboard per piece type and color
+        self.occ_w = 0
+        self.occ_b = 0
+        self.occ = 0  # occ_w | occ_b, kept up to date by move_piece
+        # Squares attacked by each side, rebuilt after every move
+        self.attacks_w = 0
+        self.attacks_b = 0
+        self.hash = 0  # Zobrist hash of the piece placement
+        self.version = 0  # Incremented on every move
+        self._move_cache = {}
         self.current_player = Color.WHITE
         self.selected_piece = None
+
+        # Drawing resources, created once and shared by the pixmap builders
+        self._light = QColor(240, 217, 181)  # Beige
+        self._dark = QColor(181, 136, 99)    # Brown
+        self._coord_color = QColor(100, 100, 100)
+        self._coord_font = QFont('Arial', 10)
+        self._piece_font = QFont('Arial', 36)  # Larger font
+
+        self.build_background()
+        self.build_glyphs()
         self.initialize_board()
 
     def initialize_board(self):
@@ -175,41 +280,110 @@ class ChessBoard(QWidget):
                        PieceType.QUEEN, PieceType.KING, PieceType.BISHOP,
                        PieceType.KNIGHT, PieceType.ROOK]
 
+        self.squares = [None] * 64
+        self.bb = [0] * 12
+        self.occ_w = 0
+        self.occ_b = 0
+        self.occ = 0
+        self.hash = 0
+        self.version = 0
+        self._move_cache.clear()
+
         # Pawns
         for y in range(8):
-            self.board[1][y] = ChessPiece(PieceType.PAWN, Color.BLACK, (1, y))
-            self.board[6][y] = ChessPiece(PieceType.PAWN, Color.WHITE, (6, y))
+            self.place_piece(ChessPiece(PieceType.PAWN, Color.BLACK, (1 << 3) | y))
+            self.place_piece(ChessPiece(PieceType.PAWN, Color.WHITE, (6 << 3) | y))
 
         # Other pieces
         for y, piece_type in enumerate(piece_order):
-            self.board[0][y] = ChessPiece(piece_type, Color.BLACK, (0, y))
-            self.board[7][y] = ChessPiece(piece_type, Color.WHITE, (7, y))
+            self.place_piece(ChessPiece(piece_type, Color.BLACK, y))
+            self.place_piece(ChessPiece(piece_type, Color.WHITE, (7 << 3) | y))
+
+        self.update_attacks()
+
+    def place_piece(self, piece):
+        sq = piece.position
+        bit = 1 << sq
+        self.squares[sq] = piece
+        self.bb[piece.code] |= bit
+        self.hash ^= ZOBRIST[piece.code][sq]
+        self.occ |= bit
+        if piece.color == Color.WHITE:
+            self.occ_w |= bit
+        else:
+            self.occ_b |= bit
+
+    def update_attacks(self):
+        """Rebuild the attacked-squares bitboards of both sides"""
+        bb = self.bb
+        occupied = self.occ
+        for color in Color:
+            pawns = bb[bitboard_index(PieceType.PAWN, color)]
+            queens = bb[bitboard_index(PieceType.QUEEN, color)]
+            attacks = pawn_attacks(color, pawns)
+            for sq in iter_bits(bb[bitboard_index(PieceType.KNIGHT, color)]):
+                attacks |= KNIGHT_ATTACKS[sq]
+            for sq in iter_bits(bb[bitboard_index(PieceType.ROOK, color)] | queens):
+                attacks |= ROOK_SLIDE[sq](occupied)
+            for sq in iter_bits(bb[bitboard_index(PieceType.BISHOP, color)] | queens):
+                attacks |= BISHOP_SLIDE[sq](occupied)
+            for sq in iter_bits(bb[bitboard_index(PieceType.KING, color)]):
+                attacks |= KING_ATTACKS[sq]
+            if color == Color.WHITE:
+                self.attacks_w = attacks
+            else:
+                self.attacks_b = attacks
+
+    def is_square_attacked(self, sq, by_color):
+        attacks = self.attacks_w if by_color == Color.WHITE else self.attacks_b
+        return bool((attacks >> sq) & 1)
+
+    def is_in_check(self, color):
+        king = self.bb[bitboard_index(PieceType.KING, color)]
+        attacks = self.attacks_b if color == Color.WHITE else self.attacks_w
+        return bool(king & attacks)
+
+    def get_possible_moves(self, piece):
+        """Possible moves for a piece on this board, cached per piece and by position hash"""
+        if piece.cached_version == self.version:
+            return piece.cached_moves
+
+        # The placement hash and the square identify the piece and every
+        # blocker, which is all move generation looks at.
+        key = (self.hash, piece.position)
+        moves = self._move_cache.get(key)
+        if moves is None:
+            if len(self._move_cache) >= MOVE_CACHE_SIZE:
+                self._move_cache.clear()
+            moves = self._move_cache[key] = piece.get_possible_moves(self)
+        piece.cached_version = self.version
+        piece.cached_moves = moves
+        return moves
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
+    def build_background(self):
+        """Render the squares and coordinate labels once into a pixmap"""
+        self._bg = QPixmap(self.size())
+        painter = QPainter(self._bg)
         cell_size = self.CELL_SIZE
 
         # Draw board with slightly more pronounced colors
-        light_square = QColor(240, 217, 181)  # Beige
-        dark_square = QColor(181, 136, 99)    # Brown
-
         for row in range(8):
             for col in range(8):
                 # Alternate square colors
-                color = light_square if (row + col) % 2 == 0 else dark_square
+                color = self._light if (row + col) % 2 == 0 else self._dark
                 painter.fillRect(col * cell_size, row * cell_size,
                                  cell_size, cell_size, color)
 
         # Draw coordinate labels
-        painter.setPen(QColor(100, 100, 100))
-        painter.setFont(QFont('Arial', 10))
+        painter.setPen(self._coord_color)
+        painter.setFont(self._coord_font)
         
         # Column labels (a-h)
         for col in range(8):
             label = chr(ord('a') + col)
             painter.drawText(
                 col * cell_size + cell_size // 2 - 5, 
-                self.height() - 5, 
+                self._bg.height() - 5, 
                 label
             )
 
@@ -222,45 +396,86 @@ class ChessBoard(QWidget):
                 label
             )
 
-        # Draw pieces with larger, more readable symbols
-        painter.setFont(QFont('Arial', 36))  # Larger font
-        for row in range(8):
-            for col in range(8):
-                piece = self.board[row][col]
+        painter.end()
+
+    def build_glyphs(self):
+        """Pre-render every piece into a transparent cell-sized pixmap"""
+        cell_size = self.CELL_SIZE
+        self._glyphs = []  # Indexed by ChessPiece.code, like SYMBOLS
+        for code, symbol in enumerate(SYMBOLS):
+            glyph = QPixmap(cell_size, cell_size)
+            glyph.fill(Qt.transparent)
+            painter = QPainter(glyph)
+
+            sprite = os.path.join(PIECE_DIR, SPRITE_NAMES[code] + '.svg')
+            renderer = QSvgRenderer(sprite) if os.path.isfile(sprite) else None
+            if renderer and renderer.isValid():
+                renderer.render(painter, QRectF(0, 0, cell_size, cell_size))
+            else:
+                # Larger font and different colors for white and black pieces
+                painter.setFont(self._piece_font)
+                painter.setPen(Qt.black if code // 6 == Color.BLACK else Qt.white)
+
+                # Center the piece symbol in the cell
+                painter.drawText(cell_size // 4, cell_size * 3 // 4, symbol)
+            painter.end()
+            self._glyphs.append(glyph)
+
+    def resizeEvent(self, event):
+        if event.size() != self._bg.size():
+            self.build_background()
+            self.build_glyphs()
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        cell_size = self.CELL_SIZE
+
+        # Only the exposed area needs repainting
+        clip = event.rect()
+        painter.drawPixmap(clip, self._bg, clip)
+
+        # Draw pieces from the pre-rendered glyphs, skipping squares that
+        # lie outside the exposed area
+        first_row = max(clip.top() // cell_size, 0)
+        last_row = min(clip.bottom() // cell_size, 7)
+        first_col = max(clip.left() // cell_size, 0)
+        last_col = min(clip.right() // cell_size, 7)
+        squares = self.squares
+        glyphs = self._glyphs
+        draw_pixmap = painter.drawPixmap
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                piece = squares[(row << 3) | col]
                 if piece:
-                    # Different colors for white and black pieces
-                    color = Qt.black if piece.color == Color.BLACK else Qt.white
-                    painter.setPen(color)
-                    
-                    # Center the piece symbol in the cell
-                    painter.drawText(
-                        col * cell_size + cell_size // 4,
-                        row * cell_size + cell_size * 3 // 4,
-                        self.get_piece_symbol(piece)
-                    )
+                    draw_pixmap(col * cell_size, row * cell_size,
+                                glyphs[piece.code])
 
     def get_piece_symbol(self, piece):
-        symbols = {
-            PieceType.PAWN: '♙' if piece.color == Color.WHITE else '♟',
-            PieceType.ROOK: '♖' if piece.color == Color.WHITE else '♜',
-            PieceType.KNIGHT: '♘' if piece.color == Color.WHITE else '♞',
-            PieceType.BISHOP: '♗' if piece.color == Color.WHITE else '♝',
-            PieceType.QUEEN: '♕' if piece.color == Color.WHITE else '♛',
-            PieceType.KING: '♔' if piece.color == Color.WHITE else '♚'
-        }
-        return symbols[piece.type]
+        return SYMBOLS[piece.code]
+
+    def square_rect(self, sq):
+        cell_size = self.CELL_SIZE
+        return QRect((sq & 7) * cell_size, (sq >> 3) * cell_size, cell_size, cell_size)
 
     def mousePressEvent(self, event):
         cell_size = self.CELL_SIZE
         col = event.x() // cell_size
         row = event.y() // cell_size
+        sq = (row << 3) | col
+
+        clicked_piece = self.squares[sq]
 
-        clicked_piece = self.board[row][col]
+        # Squares affected by this click: the clicked one and, when a piece
+        # was already selected, the square it was selected on
+        dirty = [self.square_rect(sq)]
 
         if self.selected_piece:
+            dirty.append(self.square_rect(self.selected_piece.position))
+
             # Try to move the selected piece
-            if (row, col) in self.selected_piece.get_possible_moves(self.board):
-                self.move_piece(self.selected_piece.position, (row, col))
+            if sq in self.get_possible_moves(self.selected_piece):
+                self.move_piece(self.selected_piece.position, sq)
                 self.selected_piece = None
                 self.current_player = Color.BLACK if self.current_player == Color.WHITE else Color.WHITE
             else:
@@ -268,19 +483,41 @@ class ChessBoard(QWidget):
         elif clicked_piece and clicked_piece.color == self.current_player:
             self.selected_piece = clicked_piece
 
-        self.update()
-
-    def move_piece(self, from_pos, to_pos):
-        fx, fy = from_pos
-        tx, ty = to_pos
+        for rect in dirty:
+            self.update(rect)
+
+    def move_piece(self, from_sq, to_sq):
+        piece = self.squares[from_sq]
+        captured = self.squares[to_sq]
+        to_bb = 1 << to_sq
+        move_bb = (1 << from_sq) | to_bb
+
+        # Remove the captured piece from its bitboards
+        if captured:
+            self.bb[captured.code] ^= to_bb
+            self.hash ^= ZOBRIST[captured.code][to_sq]
+            if captured.color == Color.WHITE:
+                self.occ_w ^= to_bb
+            else:
+                self.occ_b ^= to_bb
 
         # Move the piece
-        self.board[tx][ty] = self.board[fx][fy]
-        self.board[fx][fy] = None
+        self.squares[to_sq] = piece
+        self.squares[from_sq] = None
+        zobrist = ZOBRIST[piece.code]
+        self.bb[piece.code] ^= move_bb
+        self.hash ^= zobrist[from_sq] ^ zobrist[to_sq]
+        if piece.color == Color.WHITE:
+            self.occ_w ^= move_bb
+        else:
+            self.occ_b ^= move_bb
+        self.occ = self.occ_w | self.occ_b
+        self.update_attacks()
 
         # Update piece position
-        self.board[tx][ty].position = (tx, ty)
-        self.board[tx][ty].has_moved = True
+        piece.position = to_sq
+        piece.has_moved = True
+        self.version += 1
 
 class ChessGame(QMainWindow):
     def __init__(self):